@@ -1,19 +1,35 @@
 import os
+import atexit
+import hmac
 import sqlite3
 import threading
+import queue
 import csv
 import io
 import base64
+import hashlib
+import click
+import orjson
+import redis
 import requests
 import time
-from datetime import datetime
+import zlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from functools import lru_cache
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import (
-    Flask, request, jsonify,
-    render_template, session,
-    redirect, send_file
+    Flask, request,
+    render_template, session, make_response, g,
+    redirect, Response, stream_with_context
 )
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_compress import Compress
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from dotenv import load_dotenv
 
 
@@ -23,20 +39,23 @@ load_dotenv(os.path.join(BASE_DIR, ".env"))
 
 # ---------- CONFIG ----------
 DB_PATH = os.path.join(BASE_DIR, "leads.db")
+JINJA_CACHE_DIR = os.path.join(BASE_DIR, ".jinja_cache")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME")
-ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
+ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH")
 
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 EMAIL_FROM = os.getenv("EMAIL_FROM")
 EMAIL_TO = os.getenv("EMAIL_TO")
 BACKUP_KEY = os.getenv("BACKUP_KEY")
 
+# optional: share rate limits across workers and restarts
+REDIS_URL = os.getenv("REDIS_URL")
+
 if not all([
     SECRET_KEY,
     ADMIN_USERNAME,
-    ADMIN_PASSWORD,
     SENDGRID_API_KEY,
     EMAIL_FROM,
     EMAIL_TO,
@@ -44,7 +63,25 @@ if not all([
 ]):
     raise RuntimeError("Missing environment variables")
 
-ADMIN_PASSWORD_HASH = generate_password_hash(ADMIN_PASSWORD)
+PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# generated with `flask hash-admin-password`; unset disables admin login
+if not ADMIN_PASSWORD_HASH:
+    print("ADMIN_PASSWORD_HASH not set. Admin login disabled.")
+
+# argon2 and hashlib release the GIL, so threads hash in parallel
+KDF_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="kdf"
+)
+
+def verify_password(password_hash, password):
+    if password_hash.startswith("$argon2"):
+        try:
+            return PASSWORD_HASHER.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    # hashes from before the switch to argon2
+    return check_password_hash(password_hash, password)
 
 app = Flask(
     __name__,
@@ -56,20 +93,250 @@ app.secret_key = SECRET_KEY
 
 app.config.update(
     SESSION_COOKIE_HTTPONLY=True,
-    SESSION_COOKIE_SAMESITE="Lax"
+    SESSION_COOKIE_SAMESITE="Lax",
+    COMPRESS_MIMETYPES=[
+        "text/html", "text/css", "text/csv",
+        "application/javascript", "application/json"
+    ],
+    COMPRESS_LEVEL=6,
+    # static URLs are versioned, see static_version
+    SEND_FILE_MAX_AGE_DEFAULT=31536000
 )
 
+Compress(app)
+
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+@lru_cache(maxsize=None)
+def static_mtime(filename):
+    return int(os.path.getmtime(os.path.join(app.static_folder, filename)))
+
+@app.url_defaults
+def static_version(endpoint, values):
+    if endpoint == "static" and "filename" in values:
+        values["v"] = static_mtime(values["filename"])
+
 # ---------- RATE LIMIT ----------
-REQUEST_LOG = {}
+CONTACT_LIMIT = 1
+CONTACT_WINDOW = 5
+LOGIN_IP_LIMIT = 20
+LOGIN_LIMIT = 5
+LOGIN_WINDOW = 60
+
+# atomic sliding window shared by every worker
+RATE_LIMIT_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# fail fast into the in-process fallback
+REDIS_TIMEOUT = 0.3
+
+if REDIS_URL:
+    REDIS = redis.Redis(connection_pool=redis.ConnectionPool.from_url(
+        REDIS_URL,
+        socket_timeout=REDIS_TIMEOUT,
+        socket_connect_timeout=REDIS_TIMEOUT
+    ))
+    RATE_LIMIT_SCRIPT = REDIS.register_script(RATE_LIMIT_LUA)
+else:
+    RATE_LIMIT_SCRIPT = None
+
+# fallback when Redis is not configured or unreachable
+RATE_LOG = {}
+RATE_LOG_LOCK = threading.Lock()
+RATE_LOG_MAX_KEYS = 10000
+
+def rate_limited(key, limit, window):
+    now = time.time()
+
+    if RATE_LIMIT_SCRIPT is not None:
+        try:
+            allowed = RATE_LIMIT_SCRIPT(
+                keys=[f"rl:{key}"],
+                args=[now - window, now, limit, window]
+            )
+            return not allowed
+        except redis.RedisError as e:
+            print("Rate Limit Error:", str(e))
+
+    with RATE_LOG_LOCK:
+        if len(RATE_LOG) > RATE_LOG_MAX_KEYS:
+            for k, (expires, _) in list(RATE_LOG.items()):
+                if expires < now:
+                    del RATE_LOG[k]
+
+        _, hits = RATE_LOG.get(key, (0, []))
+        hits = [t for t in hits if now - t < window]
+        limited = len(hits) >= limit
+        if not limited:
+            hits.append(now)
+        RATE_LOG[key] = (now + window, hits)
+
+    return limited
 
 # ---------- DATABASE ----------
+DB_POOL_SIZE = min((os.cpu_count() or 1) * 2, 8)
+DB_POOL = queue.Queue(maxsize=DB_POOL_SIZE)
+DB_POOL_LOCK = threading.Lock()
+DB_POOL_CREATED = 0
+
+# SQLite has one writer at a time, so writes share one connection
+DB_WRITER = None
+DB_WRITER_LOCK = threading.Lock()
+
+DB_OPTIMIZE_INTERVAL = 3600
+DB_LAST_OPTIMIZE = time.monotonic()
+
+SQL_INSERT_LEAD = "INSERT INTO leads (name, phone, message) VALUES (?, ?, ?)"
+SQL_MARK_CONTACTED = "UPDATE leads SET status='contacted' WHERE id=?"
+SQL_DELETE_LEAD = "DELETE FROM leads WHERE id=?"
+SQL_LEAD_STATS = "SELECT status, COUNT(*), MAX(id) FROM leads GROUP BY status"
+SQL_HAS_LEADS = "SELECT 1 FROM leads LIMIT 1"
+# MATCH stays alone in the CTE so the FTS index is used
+SQL_SEARCH_FTS = """
+    WITH m AS (
+        SELECT rowid FROM leads_fts
+        WHERE leads_fts MATCH :query
+        ORDER BY bm25(leads_fts)
+        LIMIT :candidates
+    )
+    SELECT l.id, l.name, l.phone, l.message, l.status, l.created_at
+    FROM m
+    CROSS JOIN leads l ON l.id = m.rowid
+    WHERE :status = '' OR l.status = :status
+    ORDER BY l.created_at DESC LIMIT :limit
+"""
+SQL_SEARCH_LIKE = """
+    SELECT id, name, phone, message, status, created_at FROM leads
+    WHERE search_blob LIKE :pattern
+    AND (:status = '' OR status = :status)
+    ORDER BY created_at DESC, id DESC LIMIT :limit
+"""
+SQL_EXPORT = """
+    SELECT id, name, phone, message, status, created_at
+    FROM leads ORDER BY created_at DESC
+"""
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(
+        DB_PATH,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=256
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-64000")
     return conn
 
+def acquire_db():
+    global DB_POOL_CREATED
+
+    try:
+        return DB_POOL.get_nowait()
+    except queue.Empty:
+        with DB_POOL_LOCK:
+            can_create = DB_POOL_CREATED < DB_POOL_SIZE
+            if can_create:
+                DB_POOL_CREATED += 1
+        return get_db_connection() if can_create else DB_POOL.get()
+
+def release_db(conn):
+    global DB_LAST_OPTIMIZE
+
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+
+        with DB_POOL_LOCK:
+            now = time.monotonic()
+            optimize = now - DB_LAST_OPTIMIZE >= DB_OPTIMIZE_INTERVAL
+            if optimize:
+                DB_LAST_OPTIMIZE = now
+        if optimize:
+            conn.execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        print("DB Release Error:", str(e))
+    finally:
+        # a lost connection would starve acquire_db
+        DB_POOL.put(conn)
+
+@contextmanager
+def db():
+    conn = acquire_db()
+    try:
+        yield conn
+    finally:
+        release_db(conn)
+
+@contextmanager
+def db_writer():
+    global DB_WRITER
+
+    with DB_WRITER_LOCK:
+        if DB_WRITER is None:
+            DB_WRITER = get_db_connection()
+        try:
+            yield DB_WRITER
+        finally:
+            if DB_WRITER.in_transaction:
+                DB_WRITER.rollback()
+
+def get_db():
+    if "db" not in g:
+        g.db = acquire_db()
+    return g.db
+
+@app.teardown_appcontext
+def teardown_db(exception):
+    conn = g.pop("db", None)
+    if conn is not None:
+        release_db(conn)
+
+def close_db_pool():
+    global DB_WRITER
+
+    conns = []
+    while True:
+        try:
+            conns.append(DB_POOL.get_nowait())
+        except queue.Empty:
+            break
+
+    # the lead writer may still be using it
+    with DB_WRITER_LOCK:
+        if DB_WRITER is not None:
+            conns.append(DB_WRITER)
+            DB_WRITER = None
+
+        for conn in conns:
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print("DB Optimize Error:", str(e))
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print("DB Close Error:", str(e))
+
+atexit.register(close_db_pool)
+
 def init_db():
     conn = get_db_connection()
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    # lock before reading the schema so only one booting worker migrates it
+    conn.execute("BEGIN IMMEDIATE")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS leads (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -80,58 +347,250 @@ def init_db():
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    conn.commit()
+
+    columns = [row["name"] for row in conn.execute("PRAGMA table_xinfo(leads)")]
+    if "search_blob" not in columns:
+        conn.execute("""
+            ALTER TABLE leads ADD COLUMN search_blob TEXT
+            GENERATED ALWAYS AS (name || ' ' || phone || ' ' || message) VIRTUAL
+        """)
+
+    fts_table = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='leads_fts'"
+    ).fetchone()
+    fts_exists = fts_table and "trigram" in fts_table[0]
+    if fts_table and not fts_exists:
+        # built with the old word tokenizer
+        conn.execute("DROP TABLE leads_fts")
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+            name, phone, message,
+            content='leads', content_rowid='id',
+            tokenize='trigram'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS leads_ai AFTER INSERT ON leads BEGIN
+            INSERT INTO leads_fts (rowid, name, phone, message)
+            VALUES (new.id, new.name, new.phone, new.message);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS leads_ad AFTER DELETE ON leads BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, name, phone, message)
+            VALUES ('delete', old.id, old.name, old.phone, old.message);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS leads_au
+        AFTER UPDATE OF name, phone, message ON leads BEGIN
+            INSERT INTO leads_fts (leads_fts, rowid, name, phone, message)
+            VALUES ('delete', old.id, old.name, old.phone, old.message);
+            INSERT INTO leads_fts (rowid, name, phone, message)
+            VALUES (new.id, new.name, new.phone, new.message);
+        END
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_leads_created
+        ON leads (created_at DESC, id DESC)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_status_created
+        ON leads (status, created_at DESC, id DESC)
+    """)
+
+    if not fts_exists:
+        conn.execute("INSERT INTO leads_fts (leads_fts) VALUES ('rebuild')")
+
+    conn.execute("ANALYZE")
+
+    conn.execute("COMMIT")
     conn.close()
 
 init_db()
 
 
+# ---------- LEAD WRITER ----------
+LEAD_QUEUE = queue.Queue()
+LEAD_BATCH_SIZE = 500
+LEAD_BATCH_WAIT = 0.05
+LEAD_STOP = object()
+LEAD_WRITE_RETRIES = 3
+LEAD_RETRY_BACKOFF = 0.5
+
+def write_leads(batch):
+    for attempt in range(LEAD_WRITE_RETRIES):
+        try:
+            with db_writer() as conn:
+                conn.execute("BEGIN")
+                conn.executemany(SQL_INSERT_LEAD, batch)
+                conn.execute("COMMIT")
+            return
+        except Exception as e:
+            print("Lead Write Error:", str(e))
+            if attempt + 1 < LEAD_WRITE_RETRIES:
+                time.sleep(LEAD_RETRY_BACKOFF * 2 ** attempt)
+
+    # the visitor was already told "success"
+    for lead in batch:
+        print("Lead Not Stored:", lead)
+
+def lead_writer():
+    while True:
+        lead = LEAD_QUEUE.get()
+        if lead is LEAD_STOP:
+            return
+        batch = [lead]
+        deadline = time.monotonic() + LEAD_BATCH_WAIT
+        stop = False
+
+        while len(batch) < LEAD_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                lead = LEAD_QUEUE.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if lead is LEAD_STOP:
+                stop = True
+                break
+            batch.append(lead)
+
+        write_leads(batch)
+        if stop:
+            return
+
+LEAD_WRITER = threading.Thread(target=lead_writer, daemon=True)
+LEAD_WRITER.start()
+
+def flush_leads():
+    # /contact already answered for these leads
+    LEAD_QUEUE.put(LEAD_STOP)
+    LEAD_WRITER.join(timeout=5)
+
+    batch = []
+    while True:
+        try:
+            lead = LEAD_QUEUE.get_nowait()
+        except queue.Empty:
+            break
+        if lead is not LEAD_STOP:
+            batch.append(lead)
+    if batch:
+        write_leads(batch)
+
+# atexit is LIFO, so this runs before close_db_pool
+atexit.register(flush_leads)
+
+
+PAGE_SIZE = 50
+# SQLite integers are signed 64-bit
+SQLITE_MAX_INT = 2 ** 63 - 1
+
+
+# FTS5 rejects NUL in quoted strings
+FTS_CONTROL_CHARS = {c: " " for c in [*range(32), 127]}
+
+
+def build_fts_query(search):
+    # quote terms so user input is never parsed as FTS5 syntax
+    terms = [
+        term for term in search.translate(FTS_CONTROL_CHARS).split()
+        if len(term) >= 3
+    ]
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search_leads(conn, search, status=None, limit=200):
+    fts_query = build_fts_query(search)
+    if not fts_query:
+        return conn.execute(SQL_SEARCH_LIKE, {
+            "pattern": f"%{search}%",
+            "status": status or "",
+            "limit": limit
+        }).fetchall()
+
+    return conn.execute(SQL_SEARCH_FTS, {
+        "query": fts_query,
+        "status": status or "",
+        "candidates": limit * 10 if status else limit,
+        "limit": limit
+    }).fetchall()
+
+
+def list_leads(conn, status=None, page=1, before=None):
+    sql = "SELECT id, name, phone, message, status, created_at FROM leads"
+    where = []
+    params = []
+
+    if status:
+        where.append("status = ?")
+        params.append(status)
+
+    if before:
+        # keyset pagination
+        where.append(
+            "(created_at, id) < (SELECT created_at, id FROM leads WHERE id = ?)"
+        )
+        params.append(before)
+
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+    params.append(PAGE_SIZE + 1)
+    params.append(0 if before else (page - 1) * PAGE_SIZE)
+
+    leads = conn.execute(sql, params).fetchall()
+    return leads[:PAGE_SIZE], len(leads) > PAGE_SIZE
+
+
 # ---------- PUBLIC ----------
+def json_response(payload, status=200):
+    return Response(
+        orjson.dumps(payload),
+        status=status,
+        mimetype="application/json"
+    )
+
 @app.route("/")
 def home():
     return render_template("index.html")
 
 @app.route("/privacy")
 def privacy():
-    return render_template("privacy.html", year=datetime.now().year)
+    return render_template("privacy.html", year=time.localtime().tm_year)
 
 @app.route("/contact", methods=["POST"])
 def contact():
 
     ip = request.remote_addr
-    now = time.time()
-
-    if ip in REQUEST_LOG:
-        if now - REQUEST_LOG[ip] < 5:
-            return jsonify({"status": "too_many_requests"}), 429
 
-    REQUEST_LOG[ip] = now
+    if rate_limited(f"contact:{ip}", CONTACT_LIMIT, CONTACT_WINDOW):
+        return json_response({"status": "too_many_requests"}, 429)
 
-    data = request.get_json(force=True)
-
-    name = data.get("name", "").strip()
-    phone = data.get("phone", "").strip()
-    message = data.get("message", "").strip()
+    try:
+        data = orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return json_response({"status": "error"}, 400)
+    if not isinstance(data, dict):
+        return json_response({"status": "error"}, 400)
+
+    name, phone, message = (
+        value.strip() if isinstance(value, str) else ""
+        for value in (data.get("name"), data.get("phone"), data.get("message"))
+    )
 
-    if (
-        not name or
-        not phone or
-        not message or
-        len(name) > 100 or
-        len(phone) > 20 or
-        len(message) > 1000
+    if not all(
+        0 < len(value) <= max_len
+        for value, max_len in ((name, 100), (phone, 20), (message, 1000))
     ):
-        return jsonify({"status": "error"}), 400
+        return json_response({"status": "error"}, 400)
 
-    conn = get_db_connection()
-    conn.execute(
-        "INSERT INTO leads (name, phone, message) VALUES (?, ?, ?)",
-        (name, phone, message)
-    )
-    conn.commit()
-    conn.close()
+    LEAD_QUEUE.put((name, phone, message))
 
-    return jsonify({"status": "success"}), 200
+    return json_response({"status": "success"}, 202)
 
 
 # ---------- LOGIN ----------
@@ -139,13 +598,35 @@ def contact():
 def admin_login():
     if request.method == "POST":
 
+        ip = request.remote_addr
         username = request.form.get("username", "")
         password = request.form.get("password", "")
 
         if (
-            username == ADMIN_USERNAME and
-            check_password_hash(ADMIN_PASSWORD_HASH, password)
+            rate_limited(f"login:{ip}", LOGIN_IP_LIMIT, LOGIN_WINDOW) or
+            rate_limited(f"login:{ip}:{username}", LOGIN_LIMIT, LOGIN_WINDOW)
         ):
+            return render_template(
+                "login.html",
+                error="Too many attempts. Please try again later."
+            ), 429
+
+        if not ADMIN_PASSWORD_HASH:
+            return render_template("login.html", error="Invalid credentials")
+
+        # run both checks so timing does not reveal which failed
+        future = KDF_EXECUTOR.submit(
+            verify_password, ADMIN_PASSWORD_HASH, password
+        )
+        username_ok = hmac.compare_digest(
+            username.encode(), ADMIN_USERNAME.encode()
+        )
+        try:
+            password_ok = future.result(timeout=2)
+        except FutureTimeout:
+            password_ok = False
+
+        if username_ok and password_ok:
             session["admin_logged_in"] = True
             return redirect("/admin")
 
@@ -155,47 +636,71 @@ def admin_login():
 
 
 # ---------- ADMIN DASHBOARD ----------
+def admin_page_version():
+    paths = [os.path.abspath(__file__)]
+    for folder in (app.template_folder, app.static_folder):
+        paths += [os.path.join(folder, name) for name in os.listdir(folder)]
+    return int(max(os.path.getmtime(path) for path in paths))
+
+ADMIN_PAGE_VERSION = admin_page_version()
+
 @app.route("/admin")
 def admin():
     if not session.get("admin_logged_in"):
         return redirect("/admin/login")
 
     search = request.args.get("search", "").strip()
-
-    conn = get_db_connection()
+    status = request.args.get("status", "")
+    if status not in ("new", "contacted"):
+        status = ""
+    page = request.args.get("page", 1, type=int)
+    page = min(max(page, 1), SQLITE_MAX_INT // PAGE_SIZE)
+    before = request.args.get("before", type=int)
+    if before is not None and not 0 < before <= SQLITE_MAX_INT:
+        before = None
+
+    conn = get_db()
+
+    stats = conn.execute(SQL_LEAD_STATS).fetchall()
+    counts = {row[0]: row[1] for row in stats}
+    max_id = max((row[2] for row in stats), default=0)
+    total = sum(counts.values())
+    new_count = counts.get("new", 0)
+    contacted_count = counts.get("contacted", 0)
+
+    etag = hashlib.blake2b(
+        f"{ADMIN_PAGE_VERSION}:{max_id}:{total}:{contacted_count}:".encode()
+        + request.query_string,
+        digest_size=8
+    ).hexdigest()
+
+    # Flask-Compress sends the ETag as "<etag>:<encoding>"
+    if any(tag.split(":")[0] == etag for tag in request.if_none_match):
+        resp = make_response("", 304)
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
 
     if search:
-        leads = conn.execute(
-            """
-            SELECT * FROM leads
-            WHERE name LIKE ? OR phone LIKE ? OR message LIKE ?
-            ORDER BY created_at DESC
-            """,
-            (f"%{search}%", f"%{search}%", f"%{search}%")
-        ).fetchall()
+        leads = search_leads(conn, search, status)
+        has_next = False
     else:
-        leads = conn.execute(
-            "SELECT * FROM leads ORDER BY created_at DESC"
-        ).fetchall()
-
-    total = conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
-    new_count = conn.execute(
-        "SELECT COUNT(*) FROM leads WHERE status='new'"
-    ).fetchone()[0]
-    contacted_count = conn.execute(
-        "SELECT COUNT(*) FROM leads WHERE status='contacted'"
-    ).fetchone()[0]
+        leads, has_next = list_leads(conn, status, page, before)
 
-    conn.close()
-
-    return render_template(
+    resp = make_response(render_template(
         "admin.html",
         leads=leads,
         total=total,
         new_count=new_count,
         contacted_count=contacted_count,
-        search=search
-    )
+        search=search,
+        status=status,
+        page=page,
+        has_next=has_next
+    ))
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
 
 # ---------- MARK CONTACTED ----------
@@ -204,13 +709,8 @@ def mark_contacted(lead_id):
     if not session.get("admin_logged_in"):
         return redirect("/admin/login")
 
-    conn = get_db_connection()
-    conn.execute(
-        "UPDATE leads SET status='contacted' WHERE id=?",
-        (lead_id,)
-    )
-    conn.commit()
-    conn.close()
+    with db_writer() as conn:
+        conn.execute(SQL_MARK_CONTACTED, (lead_id,))
 
     return redirect("/admin")
 
@@ -221,88 +721,105 @@ def delete_lead(lead_id):
     if not session.get("admin_logged_in"):
         return redirect("/admin/login")
 
-    conn = get_db_connection()
-    conn.execute(
-        "DELETE FROM leads WHERE id=?",
-        (lead_id,)
-    )
-    conn.commit()
-    conn.close()
+    with db_writer() as conn:
+        conn.execute(SQL_DELETE_LEAD, (lead_id,))
 
     return redirect("/admin")
 
 
+# ---------- CSV EXPORT ----------
+CSV_HEADER = ["ID", "Name", "Phone", "Message", "Status", "Created At"]
+
+def export_rows(conn):
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(SQL_EXPORT)
+
+CSV_CHUNK_SIZE = 64 * 1024
+CSV_FETCH_SIZE = 1000
+
+def iter_leads_csv(conn):
+    buf = io.BytesIO()
+    text = io.TextIOWrapper(buf, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(CSV_HEADER)
+
+    cursor = export_rows(conn)
+    while True:
+        rows = cursor.fetchmany(CSV_FETCH_SIZE)
+        if not rows:
+            break
+        writer.writerows(rows)
+        if buf.tell() >= CSV_CHUNK_SIZE:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+    yield buf.getvalue()
+    # detach so buf is not closed with the wrapper
+    text.detach()
+
+def encode_leads_backup(conn):
+    # base64 whole 3-byte groups so the pieces join cleanly
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    encoded = []
+    pending = b""
+
+    for chunk in iter_leads_csv(conn):
+        pending += compressor.compress(chunk)
+        cut = len(pending) - len(pending) % 3
+        encoded.append(base64.b64encode(pending[:cut]))
+        pending = pending[cut:]
+
+    pending += compressor.flush()
+    encoded.append(base64.b64encode(pending))
+    return b"".join(encoded).decode()
+
+
 # ---------- CSV DOWNLOAD ----------
 @app.route("/admin/download")
 def download_leads():
     if not session.get("admin_logged_in"):
         return redirect("/admin/login")
 
-    conn = get_db_connection()
-    rows = conn.execute(
-        "SELECT * FROM leads ORDER BY created_at DESC"
-    ).fetchall()
-    conn.close()
+    has_rows = get_db().execute(SQL_HAS_LEADS).fetchone()
 
-    if not rows:
+    if not has_rows:
         return "No data available"
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["ID", "Name", "Phone", "Message", "Status", "Created At"])
-
-    for r in rows:
-        writer.writerow([
-            r["id"],
-            r["name"],
-            r["phone"],
-            r["message"],
-            r["status"],
-            r["created_at"]
-        ])
-
-    memory_file = io.BytesIO()
-    memory_file.write(output.getvalue().encode())
-    memory_file.seek(0)
-
-    filename = f"leads_backup_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.csv"
-
-    return send_file(
-        memory_file,
-        as_attachment=True,
-        download_name=filename,
-        mimetype="text/csv"
+    filename = f"leads_backup_{time.strftime('%Y-%m-%d_%H-%M')}.csv"
+
+    return Response(
+        stream_with_context(iter_leads_csv(get_db())),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 
 # ---------- SENDGRID BACKUP ----------
+# Retry never resends a POST that reached SendGrid
+SENDGRID = requests.Session()
+SENDGRID.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=4,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+)
+SENDGRID.headers.update({
+    "Authorization": f"Bearer {SENDGRID_API_KEY}",
+    "Content-Type": "application/json"
+})
+
 def send_db_backup_email():
     try:
-        conn = get_db_connection()
-        rows = conn.execute(
-            "SELECT * FROM leads ORDER BY created_at DESC"
-        ).fetchall()
-        conn.close()
+        with db() as conn:
+            if not conn.execute(SQL_HAS_LEADS).fetchone():
+                print("No leads found. Backup skipped.")
+                return
 
-        if not rows:
-            print("No leads found. Backup skipped.")
-            return
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["ID", "Name", "Phone", "Message", "Status", "Created At"])
-
-        for r in rows:
-            writer.writerow([
-                r["id"],
-                r["name"],
-                r["phone"],
-                r["message"],
-                r["status"],
-                r["created_at"]
-            ])
-
-        encoded_csv = base64.b64encode(output.getvalue().encode()).decode()
+            encoded_csv = encode_leads_backup(conn)
 
         payload = {
             "personalizations": [{
@@ -316,20 +833,14 @@ def send_db_backup_email():
             }],
             "attachments": [{
                 "content": encoded_csv,
-                "type": "text/csv",
-                "filename": "leads_backup.csv"
+                "type": "application/gzip",
+                "filename": "leads_backup.csv.gz"
             }]
         }
 
-        headers = {
-            "Authorization": f"Bearer {SENDGRID_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        response = requests.post(
+        response = SENDGRID.post(
             "https://api.sendgrid.com/v3/mail/send",
             json=payload,
-            headers=headers,
             timeout=15
         )
 
@@ -343,15 +854,21 @@ def send_db_backup_email():
 
 
 # ---------- BACKUP ROUTE ----------
+BACKUP_EXEC = ThreadPoolExecutor(max_workers=2, thread_name_prefix="backup")
+BACKUP_MAX_PENDING = 4
+BACKUP_SLOTS = threading.BoundedSemaphore(BACKUP_MAX_PENDING)
+
 @app.route("/admin/backup")
 def admin_backup():
-    if request.args.get("key") != BACKUP_KEY:
+    key = request.args.get("key", "")
+    if not hmac.compare_digest(key.encode(), BACKUP_KEY.encode()):
         return "Unauthorized", 403
 
-    threading.Thread(
-        target=send_db_backup_email,
-        daemon=True
-    ).start()
+    if not BACKUP_SLOTS.acquire(blocking=False):
+        return "Backup already queued", 429
+
+    future = BACKUP_EXEC.submit(send_db_backup_email)
+    future.add_done_callback(lambda _: BACKUP_SLOTS.release())
 
     return "Backup triggered"
 
@@ -363,6 +880,16 @@ def admin_logout():
     return redirect("/admin/login")
 
 
+# ---------- CLI ----------
+@app.cli.command("hash-admin-password")
+def hash_admin_password():
+    """Print a hash to store in .env as ADMIN_PASSWORD_HASH."""
+    password = click.prompt(
+        "Admin password", hide_input=True, confirmation_prompt=True
+    )
+    click.echo(PASSWORD_HASHER.hash(password))
+
+
 # ---------- RUN ----------
 if __name__ == "__main__":
     app.run()
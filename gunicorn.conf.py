@@ -0,0 +1,5 @@
+import os
+
+# the app mostly waits on SQLite and SendGrid, so overlap it on threads
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))